@@ -14,7 +14,7 @@ from statistics import mean
 from itertools import product, groupby, chain
 from statistics import median
 from pathlib import Path
-from typing import Iterable, Tuple, Union, Sequence, Generic, TypeVar, Dict, Any, cast, Optional, overload, List
+from typing import Iterable, Tuple, Union, Sequence, Generic, TypeVar, Dict, Any, cast, Optional, overload, List, Set
 
 from coba.random import CobaRandom
 from coba.learners import Learner, Key
@@ -105,8 +105,9 @@ class Result:
             axes.plot(xs, ys, label=label)
 
             if show_sd:
-                ls = [ y-math.sqrt(v) for y,v in zip(ys,vs) ]
-                us = [ y+math.sqrt(v) for y,v in zip(ys,vs) ]
+                sds = [ math.sqrt(v) for v in vs ]
+                ls  = [ y-sd for y,sd in zip(ys,sds) ]
+                us  = [ y+sd for y,sd in zip(ys,sds) ]
                 axes.fill_between(xs, ls, us, alpha = 0.1)
 
             if show_err:
@@ -120,8 +121,9 @@ class Result:
                 # all 20 random variables) and not for a specific random variable. Oh well, for
                 # now I'm leaving this as it is since I don't have any better ideas. I think what
                 # I've done is ok, but I need to more some more thought into it.
-                ls = [ y-math.sqrt(v/n) for y,v,n in zip(ys,vs,ns) ]
-                us = [ y+math.sqrt(v/n) for y,v,n in zip(ys,vs,ns) ]
+                ses = [ math.sqrt(v/n) for v,n in zip(vs,ns) ]
+                ls  = [ y-se for y,se in zip(ys,ses) ]
+                us  = [ y+se for y,se in zip(ys,ses) ]
                 axes.fill_between(xs, ls, us, alpha = 0.1)
 
         learners, _, batches = self.to_indexed_tuples()
@@ -155,18 +157,15 @@ class Result:
 
             for batch_index, batch_Ns, batch_Rs in zip(itertools.count(), Ns,Rs):
 
-                incount    = 0
-                inmean     = OnlineMean()
-                invariance = OnlineVariance()
+                incount     = len(batch_Rs)
+                inmean      = OnlineMean()
+                invariance  = OnlineVariance()
+                cucount     = cucount + incount
+                max_batch_N = max(max_batch_N, *batch_Ns)
 
-                for N, reward in zip(batch_Ns, batch_Rs):
-                    
-                    max_batch_N = max(N, max_batch_N)
-                    
-                    incount     = incount + 1
+                for reward in batch_Rs:
                     inmean      .update(reward)
                     invariance  .update(reward)
-                    cucount     = cucount + 1
                     cumean      .update(reward)
                     cuvariance  .update(reward)
 
@@ -282,16 +281,20 @@ class Transaction:
 
 class TaskSource(Source):
     
-    def __init__(self, simulations: Sequence[Source[BatchedSimulation]], learners: Sequence['BenchmarkLearner'], restored: Result) -> None:
-        self._simulations = simulations
-        self._learners    = learners
-        self._restored    = restored
+    def __init__(self, simulations: Sequence[Source[BatchedSimulation]], learners: Sequence['BenchmarkLearner'], restored: Result, group_learners: bool = True, group_simulations: bool = True) -> None:
+        self._simulations       = simulations
+        self._learners          = learners
+        self._restored          = restored
+        self._group_learners    = group_learners
+        self._group_simulations = group_simulations
 
     def read(self) -> Iterable:
 
         #first turn every prod(simulation,seed) into its own pipe
         #second remove pipes that are already finished
-        #group pipes into a single pipe based on source
+        #group pipes into a single pipe based on source (and simulation/learner if not grouping those)
+        #   > grouping means a source is only read once but its simulations and learners run sequentially
+        #   > not grouping means each task re-reads the source but tasks can run in parallel
 
         simulation_sources = [s._source if isinstance(s, (Pipe.SourceFilters, BenchmarkSimulation)) else s for s in self._simulations]
         sources_set        = list(set(simulation_sources))
@@ -306,14 +309,20 @@ class TaskSource(Source):
         is_not_complete = lambda t: t not in restored.batches and t[0] not in zero_batch_sims
         task_keys       = filter(is_not_complete, product(simulations.keys(), learners.keys()))
 
-        source_grouped_tasks: Dict[int, Tuple[List[int], List[int], List[BenchmarkLearner], List[Source[BatchedSimulation]]]] = {}
+        source_grouped_tasks: Dict[Any, Tuple[List[int], List[int], List[BenchmarkLearner], List[Source[BatchedSimulation]]]] = {}
 
         for simulation_key, learner_key in task_keys:
+
+            group_key = (
+                source_idxs[simulation_key],
+                None if self._group_simulations else simulation_key,
+                None if self._group_learners    else learner_key
+            )
+
+            if group_key not in source_grouped_tasks:
+                source_grouped_tasks[group_key] = ([],[],[],[])
             
-            if source_idxs[simulation_key] not in source_grouped_tasks:
-                source_grouped_tasks[source_idxs[simulation_key]] = ([],[],[],[])
-            
-            source_grouped_task = source_grouped_tasks[source_idxs[simulation_key]]
+            source_grouped_task = source_grouped_tasks[group_key]
 
             source_grouped_task[0].append(simulation_key)
             source_grouped_task[1].append(learner_key)
@@ -545,6 +554,10 @@ class TransactionIsNew(Filter):
 
         self._existing = existing
 
+        #when learners or seeds are evaluated in separate tasks every one of those tasks
+        #writes its simulation's transaction so we also drop simulations we've already seen
+        self._simulation_ids: Set[int] = set()
+
     def filter(self, items: Iterable[Any]) -> Iterable[Any]:
         for item in items:
 
@@ -559,9 +572,12 @@ class TransactionIsNew(Filter):
             if tipe == "B" and item[1] in self._existing.batches:
                 continue
 
-            if tipe == "S" and item[1] in self._existing.simulations:
+            if tipe == "S" and (item[1] in self._existing.simulations or item[1] in self._simulation_ids):
                 continue
 
+            if tipe == "S":
+                self._simulation_ids.add(item[1])
+
             if tipe == "L" and item[1] in self._existing.learners:
                 continue
 
@@ -626,7 +642,7 @@ class BenchmarkLearner:
 
     def choose(self, key: Key, context: Context, actions: Sequence[Action]) -> Tuple[Choice, float]:
         p = self._learner.predict(key, context, actions)
-        c = self._random.choice(list(range(len(actions))), p)
+        c = self._random.choice(range(len(actions)), p)
 
         return c, p[c]
     
@@ -744,7 +760,9 @@ class Benchmark(Generic[_C,_A]):
         seeds           : Sequence[Optional[int]] = [None],
         ignore_raise    : bool = True,
         processes       : int = None,
-        maxtasksperchild: int = None) -> None: ...
+        maxtasksperchild: int = None,
+        split_learners  : bool = False,
+        split_seeds     : bool = False) -> None: ...
 
     @overload
     def __init__(self,
@@ -755,7 +773,9 @@ class Benchmark(Generic[_C,_A]):
         seeds           : Sequence[Optional[int]] = [None],
         ignore_raise    : bool = True,
         processes       : int = None,
-        maxtasksperchild: int = None) -> None: ...
+        maxtasksperchild: int = None,
+        split_learners  : bool = False,
+        split_seeds     : bool = False) -> None: ...
 
     @overload
     def __init__(self, 
@@ -765,7 +785,9 @@ class Benchmark(Generic[_C,_A]):
         seeds           : Sequence[Optional[int]] = [None],
         ignore_raise    : bool = True,
         processes       : int = None,
-        maxtasksperchild: int = None) -> None: ...
+        maxtasksperchild: int = None,
+        split_learners  : bool = False,
+        split_seeds     : bool = False) -> None: ...
 
     def __init__(self,*args, **kwargs) -> None:
         """Instantiate a UniversalBenchmark.
@@ -777,6 +799,11 @@ class Benchmark(Generic[_C,_A]):
             shuffle_seeds: A sequence of seeds for interaction shuffling. None means no shuffle.
             processes: The number of process to spawn during evalution (overrides coba config).
             maxtasksperchild: The number of tasks each process will perform before a refresh.
+            split_learners: Should learners be evaluated in separate tasks when using several processes. This
+                lets learners on the same simulation run concurrently but every task reads its simulation's
+                source again (e.g., downloading and cleaning an OpenML dataset) unless a file cache is used.
+            split_seeds: Should each shuffle seed be evaluated in separate tasks when using several processes.
+                Like `split_learners` this adds concurrency but every task re-reads its simulation's source.
         
         See the overloads for more information.
         """
@@ -817,6 +844,8 @@ class Benchmark(Generic[_C,_A]):
         self._ignore_raise     = cast(bool                                               ,kwargs.get('ignore_raise', True))
         self._processes        = cast(Optional[int]                                      ,kwargs.get('processes', None))
         self._maxtasksperchild = cast(Optional[int]                                      ,kwargs.get('maxtasksperchild', None))
+        self._split_learners   = cast(bool                                               ,kwargs.get('split_learners', False))
+        self._split_seeds      = cast(bool                                               ,kwargs.get('split_seeds', False))
 
     def ignore_raise(self, value:bool=True) -> 'Benchmark[_C,_A]':
         self._ignore_raise = value
@@ -830,6 +859,14 @@ class Benchmark(Generic[_C,_A]):
         self._maxtasksperchild = value
         return self
 
+    def split_learners(self, value:bool=True) -> 'Benchmark[_C,_A]':
+        self._split_learners = value
+        return self
+
+    def split_seeds(self, value:bool=True) -> 'Benchmark[_C,_A]':
+        self._split_seeds = value
+        return self
+
     def evaluate(self, learners: Sequence[Learner[_C,_A]], transaction_log:str = None, seed:int = None) -> Result:
         """Collect observations of a Learner playing the benchmark's simulations to calculate Results.
 
@@ -841,7 +878,16 @@ class Benchmark(Generic[_C,_A]):
         """
         benchmark_learners   = [ BenchmarkLearner(learner, seed) for learner in learners ] #type: ignore
         restored             = Result.from_transaction_log(transaction_log)
-        task_source          = TaskSource(self._simulation_pipes, benchmark_learners, restored)
+
+        mp = self._processes if self._processes else ExecutionContext.Config.processes
+        mt = self._maxtasksperchild if self._maxtasksperchild else ExecutionContext.Config.maxtasksperchild
+
+        #by default every task reads a source once and evaluates all of its simulations and learners.
+        #Splitting learners or seeds into their own tasks lets them run concurrently at the cost of re-reading sources.
+        group_learners    = mp == 1 or not self._split_learners
+        group_simulations = mp == 1 or not self._split_seeds
+
+        task_source          = TaskSource(self._simulation_pipes, benchmark_learners, restored, group_learners=group_learners, group_simulations=group_simulations)
         task_to_transactions = TaskToTransactions(self._ignore_raise)
         transaction_sink     = TransactionSink(transaction_log, restored)
 
@@ -857,9 +903,6 @@ class Benchmark(Generic[_C,_A]):
         preamble_transactions.append(Transaction.benchmark(n_given_learners, n_given_simulations))
         preamble_transactions.extend(Transaction.learners(benchmark_learners))
 
-        mp = self._processes if self._processes else ExecutionContext.Config.processes
-        mt = self._maxtasksperchild if self._maxtasksperchild else ExecutionContext.Config.maxtasksperchild
-        
         Pipe.join(MemorySource(preamble_transactions), []                    , transaction_sink).run(1,None)
         Pipe.join(task_source                        , [task_to_transactions], transaction_sink).run(mp,mt)
 
@@ -197,6 +197,13 @@ class NumericEncoder(Encoder[float]):
         #    return [float(value) if cast(str,value).isnumeric() else float('nan') for value in values]
         #else:
 
+        #most columns are entirely numeric so we first try converting every value in C via map
+        #and only fall back to converting value by value when something can't be converted
+        try:
+            return list(map(float, values))
+        except Exception:
+            pass
+
         def float_generator() -> Iterator[float]:
             for value in values:
                 try:
@@ -5,15 +5,14 @@ with a number of Learner implementations out of the box for testing and baseline
 """
 
 import math
-import collections
 
 from abc import ABC, abstractmethod
-from typing import Any, Sequence, Tuple, Optional, Dict, cast, Generic, TypeVar, overload, Union
-from collections import defaultdict
+from typing import Any, Sequence, Tuple, Optional, Dict, List, Generic, TypeVar, overload, Union
 
 import coba.vowpal as VW
 
 from coba.random import CobaRandom
+from coba.execution import ExecutionContext
 from coba.simulations import Context, Action, Reward, Key
 from coba.statistics import OnlineVariance
 
@@ -97,6 +96,11 @@ class Learner(Generic[_C_in, _A_in], ABC):
 class RandomLearner(Learner[Context, Action]):
     """A Learner implementation that selects an action at random and learns nothing."""
 
+    def __init__(self) -> None:
+        """Instantiate a RandomLearner."""
+
+        self._probs: Sequence[float] = []
+
     @property
     def family(self) -> str:
         """The family of the learner.
@@ -123,8 +127,15 @@ class RandomLearner(Learner[Context, Action]):
 
         Returns:
             The probability of taking each action. See the base class for more information.
+
+        Remarks:
+            The number of actions rarely changes between interactions so we reuse the previously
+            returned probabilities whenever it stays the same. Callers must not modify the result.
         """
-        return [1/len(actions)] * len(actions)
+        if len(self._probs) != len(actions):
+            self._probs = [1/len(actions)] * len(actions)
+
+        return self._probs
 
     def learn(self, key: Key, context: Context, action: Action, reward: Reward, probability: float) -> None:
         """Learns nothing.
@@ -155,9 +166,10 @@ class EpsilonLearner(Learner[Context, Action]):
 
         self._epsilon         = epsilon
         self._include_context = include_context
+        self._key             = _context_action_key if include_context else _action_key
 
-        self._N: Dict[Tuple[Context, Action], int            ] = defaultdict(int)
-        self._Q: Dict[Tuple[Context, Action], Optional[float]] = defaultdict(int)
+        #each entry holds [the number of observations, the mean observed reward]
+        self._stats: Dict[Tuple[Context, Action], List[float]] = {}
 
     @property
     def family(self) -> str:
@@ -190,15 +202,20 @@ class EpsilonLearner(Learner[Context, Action]):
             The probability of taking each action. See the base class for more information.
         """
 
-        keys        = [ self._key(context,action) for action in actions ]
-        values      = [ self._Q[key] for key in keys ]
-        max_value   = None if set(values) == {None} else max(v for v in values if v is not None)
-        max_indexes = [i for i in range(len(values)) if values[i]==max_value]
+        if len(actions) == 1:
+            return [1.0]
+
+        stats = self._stats
+        key   = self._key
 
-        prob_selected_randomly = [1/len(actions) * self._epsilon] * len(actions)
-        prob_selected_greedily = [ int(i in max_indexes)/len(max_indexes) * (1-self._epsilon) for i in range(len(actions))]
+        values    = [ stats.get(key(context,action), (0,0))[1] for action in actions ]
+        max_value = max(values)
+        max_count = values.count(max_value)
 
-        return [p1+p2 for p1,p2 in zip(prob_selected_randomly,prob_selected_greedily)]
+        prob_selected_randomly = 1/len(actions) * self._epsilon
+        prob_selected_greedily = 1/max_count * (1-self._epsilon)
+
+        return [ prob_selected_randomly + int(value == max_value) * prob_selected_greedily for value in values ]
 
     def learn(self, key: Key, context: Context, action: Action, reward: Reward, probability: float) -> None:
         """Smooth the observed reward into our current estimate of either E[R|S,A] or E[R|A].
@@ -211,15 +228,16 @@ class EpsilonLearner(Learner[Context, Action]):
         """
 
         sa_key = self._key(context,action)
-        alpha  = 1/(self._N[sa_key]+1)
-
-        old_Q = cast(float, 0 if self._Q[sa_key] is None else self._Q[sa_key])
 
-        self._Q[sa_key] = (1-alpha) * old_Q + alpha * reward
-        self._N[sa_key] = self._N[sa_key] + 1
+        try:
+            stats = self._stats[sa_key]
+        except KeyError:
+            self._stats[sa_key] = [1, reward]
+        else:
+            alpha = 1/(stats[0]+1)
 
-    def _key(self, context: Context, action: Action) -> Tuple[Context,Action]:
-        return (context, action) if self._include_context else (None, action)
+            stats[0] = stats[0] + 1
+            stats[1] = (1-alpha) * stats[1] + alpha * reward
 
 class UcbTunedLearner(Learner[Context, Action]):
     """This is an implementation of Auer et al. (2002) UCB1-Tuned algorithm.
@@ -235,9 +253,15 @@ class UcbTunedLearner(Learner[Context, Action]):
 
         self._init_a: int = 0
         self._t     : int = 0
-        self._s     : Dict[Action, int           ] = defaultdict(int)
-        self._m     : Dict[Action, float         ] = {}
-        self._v     : Dict[Action, OnlineVariance] = defaultdict(OnlineVariance)
+        self._ln_t  : float = 0.0
+
+        #actions are given an index when first learned about and their statistics are
+        #stored in parallel lists by that index so each action costs one dict lookup
+        self._i     : Dict[Action, int]        = {}
+        self._s     : List[int]                = []
+        self._m     : List[float]              = []
+        self._v     : List[OnlineVariance]     = []
+        self._ucb   : List[Tuple[int, float]]  = []
 
     @property
     def family(self) -> str:
@@ -272,12 +296,20 @@ class UcbTunedLearner(Learner[Context, Action]):
             self._init_a += 1
             return [ int(i == (self._init_a-1)) for i in range(len(actions)) ]
 
+        elif len(actions) == 1:
+            return [1.0]
+
         else:
-            values      = [ self._m[a] + self._Avg_R_UCB(a) if a in self._m else None for a in actions ]
-            max_value   = None if set(values) == {None} else max(v for v in values if v is not None)
-            max_indexes = [i for i in range(len(values)) if values[i]==max_value]
+            values    = [ None if i is None else self._m[i] + self._Avg_R_UCB(i) for i in map(self._i.get, actions) ]
+            max_value = None
+
+            for value in values:
+                if value is not None and (max_value is None or value > max_value):
+                    max_value = value
 
-            return [ int(i in max_indexes)/len(max_indexes) for i in range(len(actions)) ]
+            max_count = values.count(max_value)
+
+            return [ int(value == max_value)/max_count for value in values ]
 
     def learn(self, key: Key, context: Context, action: Action, reward: Reward, probability: float) -> None:
         """Smooth the observed reward into our current estimate of E[R|A].
@@ -289,36 +321,56 @@ class UcbTunedLearner(Learner[Context, Action]):
             reward: The reward that was gained from the action. See the base class for more information.
         """
 
-        if action not in self._m:
-            self._m[action] = reward
+        i = self._i.get(action)
+
+        if i is None:
+            i = self._i[action] = len(self._m)
+
+            self._s  .append(0)
+            self._m  .append(reward)
+            self._v  .append(OnlineVariance())
+            self._ucb.append((0, 0.0))
         else:
-            self._m[action] = (1-1/self._s[action]) * self._m[action] + 1/self._s[action] * reward
+            self._m[i] = (1-1/self._s[i]) * self._m[i] + 1/self._s[i] * reward
 
-        self._t         += 1
-        self._s[action] += 1
-        self._v[action].update(reward)
+        self._t    += 1
+        self._ln_t  = math.log(self._t)
+        self._s[i] += 1
+        self._v[i].update(reward)
 
-    def _Avg_R_UCB(self, action: Action) -> float:
+    def _Avg_R_UCB(self, i: int) -> float:
         """Produce the estimated upper confidence bound (UCB) for E[R|A].
 
         Args:
-            action: The action for which we want to retrieve UCB for E[R|A].
+            i: The index of the action for which we want to retrieve UCB for E[R|A].
 
         Returns:
             The estimated UCB for E[R|A].
 
         Remarks:
-            See the beginning of section 4 in the algorithm's paper for this equation.
+            See the beginning of section 4 in the algorithm's paper for this equation. The UCB
+            only changes when we learn (i.e., when t changes) so we cache it by t. This means that
+            when a benchmark predicts an entire batch before learning we only calculate it once.
         """
-        ln = math.log; n = self._t; n_j = self._s[action]; V_j = self._Var_R_UCB(action)
 
-        return math.sqrt(ln(n)/n_j * min(1/4,V_j))
+        cached_t, cached_ucb = self._ucb[i]
+
+        if cached_t == self._t:
+            return cached_ucb
+
+        ln_n = self._ln_t; n_j = self._s[i]; V_j = self._Var_R_UCB(i)
+
+        ucb = math.sqrt(ln_n/n_j * min(1/4,V_j))
 
-    def _Var_R_UCB(self, action: Action) -> float:
+        self._ucb[i] = (self._t, ucb)
+
+        return ucb
+
+    def _Var_R_UCB(self, i: int) -> float:
         """Produce the upper confidence bound (UCB) for Var[R|A].
 
         Args:
-            action: The action for which we want to retrieve UCB for Var[R|A].
+            i: The index of the action for which we want to retrieve UCB for Var[R|A].
 
         Returns:
             The estimated UCB for Var[R|A].
@@ -326,9 +378,9 @@ class UcbTunedLearner(Learner[Context, Action]):
         Remarks:
             See the beginning of section 4 in the algorithm's paper for this equation.
         """
-        ln = math.log; t = self._t; s = self._s[action]; var = self._v[action].variance
+        ln_t = self._ln_t; s = self._s[i]; var = self._v[i].variance
 
-        return var + math.sqrt(2*ln(t)/s)    
+        return var + math.sqrt(2*ln_t/s)    
     
 class VowpalLearner(Learner[Context, Action]):
     """A learner using Vowpal Wabbit's contextual bandit command line interface.
@@ -401,7 +453,12 @@ class VowpalLearner(Learner[Context, Action]):
         learning: Union[VW.cb_explore,VW.cb_explore_adf] = VW.cb_explore_adf(),
         exploration: Union[VW.epsilongreedy, VW.softmax, VW.bagging, VW.cover] = VW.epsilongreedy(0.025),
         **kwargs) -> None:
-        """Instantiate a VowpalLearner with the requested VW learner and exploration."""
+        """Instantiate a VowpalLearner with the requested VW learner and exploration.
+
+        Remarks:
+            Additional VW command line flags (e.g., `-b 18 --noconstant`) can be given via a `flags`
+            keyword argument. These are appended to the learning and exploration flags on creation.
+        """
 
         self._learning: Union[VW.cb_explore,VW.cb_explore_adf]
         self._exploration: Union[VW.epsilongreedy, VW.softmax, VW.bagging, VW.cover]
@@ -426,10 +483,11 @@ class VowpalLearner(Learner[Context, Action]):
             self._learning = learning
             self._exploration = exploration
 
-        self._probs: Dict[Key, Sequence[float]] = {}
-        self._actions = self._new_actions(self._learning)
+        self._actions_is_map = not isinstance(self._learning, VW.cb_explore)
+        self._actions        = self._new_actions(self._learning)
 
-        self._flags = kwargs.get('flags', '')
+        #only the learning flags depend on the actions so everything else is assembled up front
+        self._flags = f"{self._exploration.flags()} {kwargs.get('flags', '')}"
 
         self._vw = VW.pyvw_Wrapper(self._learning.formatter, seed=kwargs.get('seed', None))
 
@@ -463,14 +521,15 @@ class VowpalLearner(Learner[Context, Action]):
         """
 
         if not self._vw.created:
-            self._vw.create(self._learning.flags(actions) + " " + self._exploration.flags() + " " + self._flags)
+            self._vw.create(f"{self._learning.flags(actions)} {self._flags}")
 
         probs = self._vw.predict(context, actions)
 
         self._set_actions(key,actions)
 
-        if isinstance(self._learning, VW.cb_explore):
-            return [probs[i] for i in sorted(range(len(actions)), key=lambda i: actions.index(self._actions[i])) ]
+        if not self._actions_is_map:
+            indexes = { action:i for i,action in enumerate(actions) }
+            return [probs[i] for i in sorted(range(len(actions)), key=lambda i: indexes[self._actions[i]]) ]
         else:
             return probs
 
@@ -497,11 +556,11 @@ class VowpalLearner(Learner[Context, Action]):
         if self._actions == []:
             self._actions = actions
 
-        if isinstance(self._actions, collections.MutableMapping):
+        if self._actions_is_map:
             self._actions[key] = actions
 
     def _get_actions(self, key) -> Sequence[Action]:
-        if isinstance(self._actions, collections.MutableMapping) :
+        if self._actions_is_map:
             return self._actions.pop(key)
         else:
             return self._actions
@@ -525,8 +584,11 @@ class CorralLearner(Learner[Context, Action]):
 
         self._random   = CobaRandom(seed)
 
-        self._base_actions : Dict[Key, Sequence[Action]] = {}
-        self._base_predicts: Dict[Key, Sequence[float]]  = {}
+        #simulations usually learn about an interaction immediately after predicting it so the
+        #most recent predict is held separately and only moved into the dictionary when another
+        #predict arrives before it has been learned from (e.g., when batch sizes are larger than 1)
+        self._last_base    : Optional[Tuple[Key, Sequence[Action], Sequence[float]]] = None
+        self._pending_base : Dict[Key, Tuple[Sequence[Action], Sequence[float]]]     = {}
 
     @property
     def family(self) -> str:
@@ -548,91 +610,148 @@ class CorralLearner(Learner[Context, Action]):
 
         predicts = [ base_algorithm.predict(key, context, actions) for base_algorithm in self._base_learners ]
         
-        base_actions  = [ self._random.choice(actions, predict) for predict in predicts                   ]
-        base_predicts = [ predict[actions.index(action)] for action,predict in zip(base_actions,predicts) ]
+        #we sample action indexes rather than actions so we never have to search actions for them
+        indexes = [ self._random.choice(range(len(actions)), predict) for predict in predicts ]
 
-        self._base_actions[key]  = base_actions
-        self._base_predicts[key] = base_predicts
+        base_actions  = [ actions[i] for i in indexes                    ]
+        base_predicts = [ predict[i] for i,predict in zip(indexes,predicts) ]
 
-        return [ sum([p_b*int(a==b_a) for p_b,b_a in zip(self._p_bars, base_actions)]) for a in actions ]
+        if self._last_base is not None and self._last_base[0] != key:
+            last_key, last_actions, last_predicts = self._last_base
+            self._pending_base[last_key] = (last_actions, last_predicts)
 
-    def learn(self, key: Key, context: Context, action: Action, reward: Reward, probability: float) -> None:
+        if self._pending_base:
+            #predicting a key again replaces what we previously stored for it
+            self._pending_base.pop(key, None)
 
-        loss = 1-reward # Corral algorithm assumes loss in [0,1]
+        self._last_base = (key, base_actions, base_predicts)
 
-        base_actions  = self._base_actions.pop(key)
-        base_predicts = self._base_predicts.pop(key)
+        probs = [0.0] * len(actions)
 
-        losses = [ loss/probability * int(act==action) for act in base_actions ]
+        for p_b, i in zip(self._p_bars, indexes):
+            probs[i] += p_b
 
-        for learner, action, L, P in zip(self._base_learners, base_actions, losses, base_predicts):
-            learner.learn(key, context, action, 1-L, P) # COBA learners assume a reward in [0,1]
+        return probs
 
-        self._ps     = list(self._log_barrier_omd(losses))
-        self._p_bars = [ (1-self._gamma)*p + self._gamma*1/len(self._base_learners) for p in self._ps ]
+    def learn(self, key: Key, context: Context, action: Action, reward: Reward, probability: float) -> None:
 
-        for i in range(len(self._base_learners)):
-            if 1/self._p_bars[i] > self._rhos[i]:
-                self._rhos[i] = 2/self._p_bars[i]
-                self._etas[i] *= self._beta
+        loss = 1-reward # Corral algorithm assumes loss in [0,1]
 
-    def _log_barrier_omd(self, losses) -> Sequence[float]:
+        if self._last_base is not None and self._last_base[0] == key:
+            _, base_actions, base_predicts = self._last_base
+            self._last_base = None
+        else:
+            base_actions, base_predicts = self._pending_base.pop(key)
 
-        f  = lambda l: float(sum( [ 1/((1/p) + eta*(loss-l)) for p, eta, loss in zip(self._ps, self._etas, losses)]))
-        df = lambda l: float(sum( [ eta/((1/p) + eta*(loss-l))**2 for p, eta, loss in zip(self._ps, self._etas, losses)]))
+        weighted_loss = loss/probability
 
-        denom_zeros = [ ((-1/p)-(eta*loss))/-eta for p, eta, loss in zip(self._ps, self._etas, losses) ]
+        losses = [ weighted_loss * int(base_action==action) for base_action in base_actions ]
 
-        min_loss = min(losses)
-        max_loss = max(losses)
+        for learner, base_action, L, P in zip(self._base_learners, base_actions, losses, base_predicts):
+            learner.learn(key, context, base_action, 1-L, P) # COBA learners assume a reward in [0,1]
 
-        precision = 4
+        self._ps[:] = self._log_barrier_omd(losses)
 
-        def newtons_zero(l,r) -> Optional[float]:
-            #depending on scales this check may fail though that seems unlikely
-            if (f(l+.0001)-1) * (f(r-.00001)-1) >= 0:
-                return None
+        gamma   = self._gamma
+        uniform = self._gamma*1/len(self._base_learners)
 
-            i = 0
-            x = (l+r)/2
+        for i, p in enumerate(self._ps):
+            p_bar = (1-gamma)*p + uniform
 
-            while True:
-                i += 1
+            self._p_bars[i] = p_bar
 
-                if df(x) == 0:
-                    print('what happened? (0)')
-                    print(x)
-                    print(self._ps)
-                    print(self._etas)
-                    print(losses)
+            if 1/p_bar > self._rhos[i]:
+                self._rhos[i] = 2/p_bar
+                self._etas[i] *= self._beta
 
-                x -= (f(x)-1)/df(x)
+    def _log_barrier_omd(self, losses) -> Sequence[float]:
 
-                if round(f(x),precision) == 1:
-                    return x
+        ps    = self._ps
+        etas  = self._etas
 
-                if (i % 30000) == 0:
-                    print(i)
+        denom_zeros = [ ((-1/p)-(eta*loss))/-eta for p, eta, loss in zip(ps, etas, losses) ]
+
+        min_loss = min(losses)
+        max_loss = max(losses)
+
+        precision = 4
 
         lmbda: Optional[float] = None
 
         if min_loss == max_loss:
             lmbda = min_loss
-        elif min_loss not in denom_zeros and round(f(min_loss),precision) == 1:
+        elif min_loss not in denom_zeros and round(_log_barrier_f(ps, etas, losses, min_loss),precision) == 1:
             lmbda = min_loss
-        elif max_loss not in denom_zeros and round(f(max_loss),precision) == 1:
+        elif max_loss not in denom_zeros and round(_log_barrier_f(ps, etas, losses, max_loss),precision) == 1:
             lmbda = max_loss
         else:
-            brackets = list(sorted(filter(lambda z: min_loss <= z and z <= max_loss, set(denom_zeros + [min_loss, max_loss]))))
-
-            for l_brack, r_brack in zip(brackets[:-1], brackets[1:]):
-                lmbda = newtons_zero(l_brack, r_brack)
+            brackets = [ z for z in denom_zeros if min_loss <= z <= max_loss ]
+            brackets.append(min_loss)
+            brackets.append(max_loss)
+            brackets.sort()
+
+            for l_brack, r_brack in zip(brackets, brackets[1:]):
+                if l_brack == r_brack: continue #duplicate bracket points aren't removed before sorting
+                lmbda = _log_barrier_newtons_zero(ps, etas, losses, l_brack, r_brack, precision)
                 if lmbda is not None: break
 
         if lmbda is None:
-            print('what happened? (None)')
-            print(self._ps)
-            print(self._etas)
-            print(losses)
+            raise Exception(f"Corral's log barrier OMD was unable to find a normalizing lambda (ps={ps}, etas={etas}, losses={losses}).")
+
+        return [ max(1/((1/p) + eta*(loss-lmbda)),.00001) for p, eta, loss in zip(ps, etas, losses)]
+
+def _context_action_key(context: Context, action: Action) -> Tuple[Context,Action]:
+    return (context, action)
+
+def _action_key(context: Context, action: Action) -> Tuple[Context,Action]:
+    return (None, action)
+
+def _log_barrier_f(ps: Sequence[float], etas: Sequence[float], losses: Sequence[float], l: float) -> float:
+    total = 0.0
+
+    for p, eta, loss in zip(ps, etas, losses):
+        total += 1/((1/p) + eta*(loss-l))
+
+    return total
+
+def _log_barrier_f_df(ps: Sequence[float], etas: Sequence[float], losses: Sequence[float], l: float) -> Tuple[float,float]:
+    #this and _log_barrier_f accumulate with +=, which can differ from sum() by float rounding
+    #since sum() uses compensated summation on Python 3.12+
+    f  = 0.0
+    df = 0.0
+
+    for p, eta, loss in zip(ps, etas, losses):
+        denom = (1/p) + eta*(loss-l)
+        f    += 1/denom
+        df   += eta/denom**2
+
+    return f, df
+
+def _log_barrier_newtons_zero(ps: Sequence[float], etas: Sequence[float], losses: Sequence[float], l: float, r: float, precision: int) -> Optional[float]:
+    f = _log_barrier_f
+
+    #depending on scales this check may fail though that seems unlikely
+    if (f(ps, etas, losses, l+.0001)-1) * (f(ps, etas, losses, r-.00001)-1) >= 0:
+        return None
+
+    i = 0
+    x = (l+r)/2
+
+    #f and df are evaluated together once per step and then reused by the next step
+    fx, dfx = _log_barrier_f_df(ps, etas, losses, x)
+
+    while True:
+        i += 1
+
+        if dfx == 0:
+            raise Exception(f"Corral's log barrier OMD reached a zero derivative at {x} (ps={ps}, etas={etas}, losses={losses}).")
+
+        x -= (fx-1)/dfx
+
+        fx, dfx = _log_barrier_f_df(ps, etas, losses, x)
+
+        if round(fx,precision) == 1:
+            return x
 
-        return [ max(1/((1/p) + eta*(loss-lmbda)),.00001) for p, eta, loss in zip(self._ps, self._etas, losses)]
\ No newline at end of file
+        if (i % 30000) == 0:
+            ExecutionContext.Logger.log(f"Corral's log barrier OMD has taken {i} Newton steps without converging.")
@@ -14,6 +14,7 @@ Remarks:
 import math
 import random as std_random
 import itertools
+import bisect
 
 from typing import Optional, Sequence, Any, List
 
@@ -80,7 +81,7 @@ class CobaRandom:
         return l
 
     def random(self) -> float:
-        return self.randoms(1)[0]
+        return self._next(1)[0]/self._m_minus_1
 
     def randint(self, a:int, b:int) -> int:
         """Generate a uniform random integer in [a, b].
@@ -104,13 +105,14 @@ class CobaRandom:
             return seq[self.randint(0, len(seq)-1)]
         else:
 
-            if sum(weights) == 0:
+            cdf = list(itertools.accumulate(weights))
+
+            if not cdf or cdf[-1] == 0:
                 raise ValueError("The sume of weights cannot be zero.")
 
-            cdf = list(itertools.accumulate(weights))
-            rng = self.random() * sum(weights)
+            rng = self.random() * cdf[-1]
 
-            return seq[[ rng <= c for c in cdf].index(True)]
+            return seq[bisect.bisect_left(cdf, rng)]
 
     def _next(self, n: int) -> Sequence[int]:
         """Generate `n` uniform random numbers in [0,m-1]
@@ -4,10 +4,11 @@ import unittest
 from pathlib import Path
 from statistics import mean
 
-from coba.simulations import LambdaSimulation
+from coba.simulations import LambdaSimulation, Simulation
+from coba.data.sources import Source
 from coba.execution import ExecutionContext, NoneLogger
 from coba.learners import Learner
-from coba.benchmarks import Benchmark, Result, Transaction, TransactionIsNew
+from coba.benchmarks import Benchmark, Result, Transaction, TransactionIsNew, TaskSource, BenchmarkLearner
 
 #for testing purposes
 class ModuloLearner(Learner[int,int]):
@@ -61,6 +62,18 @@ class NotPicklableLearner(Learner[int,int]):
     def learn(self, key, context, action, reward, probability):
         pass
 
+class CountReadsSimulation(Source[Simulation]):
+    def __init__(self, simulation: Source[Simulation], path: str) -> None:
+        self._simulation = simulation
+        self._path       = path
+
+    def read(self) -> Simulation:
+        with open(self._path, 'a') as f: f.write("read\n")
+        return self._simulation.read()
+
+    def reads(self) -> int:
+        return len(Path(self._path).read_text().splitlines()) if Path(self._path).exists() else 0
+
 class TransactionIsNew_Test(unittest.TestCase):
     
     def test_duplicates_are_dropped(self):
@@ -97,6 +110,64 @@ class TransactionIsNew_Test(unittest.TestCase):
 
         self.assertEqual(len(transactions), 3)
 
+    def test_repeated_simulations_are_dropped(self):
+        filter = TransactionIsNew(Result())
+
+        transactions = list(filter.filter([
+            Transaction.simulation(0, b='B'),
+            Transaction.batch(0, 0, reward=1),
+            Transaction.simulation(0, b='B'),
+            Transaction.batch(0, 1, reward=1)]
+        ))
+
+        self.assertEqual([t[0] for t in transactions], ["S", "B", "B"])
+
+class TaskSource_Tests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        sim1 = LambdaSimulation(5, lambda t: t, lambda t: [0,1,2], lambda c,a: a)
+        sim2 = LambdaSimulation(4, lambda t: t, lambda t: [3,4,5], lambda c,a: a)
+
+        self.simulations = Benchmark([sim1,sim2], batch_count=1, seeds=[1,2])._simulation_pipes
+        self.learners    = [BenchmarkLearner(ModuloLearner("0"), 1), BenchmarkLearner(ModuloLearner("1"), 1)]
+
+    def test_group_learners(self):
+        tasks = TaskSource(self.simulations, self.learners, Result()).read()
+
+        self.assertEqual([([0,0,1,1],[0,1,0,1]), ([2,2,3,3],[0,1,0,1])], [(t[0],t[1]) for t in tasks])
+
+    def test_not_group_learners(self):
+        tasks = TaskSource(self.simulations, self.learners, Result(), group_learners=False).read()
+
+        expected_tasks = [([0,1],[0,0]), ([0,1],[1,1]), ([2,3],[0,0]), ([2,3],[1,1])]
+
+        self.assertEqual(expected_tasks, [(t[0],t[1]) for t in tasks])
+        self.assertEqual([[self.learners[i] for i in t[1]] for t in tasks], [t[2] for t in tasks])
+        self.assertEqual([[self.simulations[i] for i in t[0]] for t in tasks], [t[3] for t in tasks])
+
+    def test_not_group_learners_skips_restored(self):
+        restored = Result.from_transactions([Transaction.batch(0, 1, N=[1], reward=[1])])
+        tasks    = TaskSource(self.simulations, self.learners, restored, group_learners=False).read()
+
+        expected_tasks = [([0,1],[0,0]), ([1],[1]), ([2,3],[0,0]), ([2,3],[1,1])]
+
+        self.assertEqual(expected_tasks, [(t[0],t[1]) for t in tasks])
+
+    def test_not_group_simulations(self):
+        tasks = TaskSource(self.simulations, self.learners, Result(), group_simulations=False).read()
+
+        expected_tasks = [([0,0],[0,1]), ([1,1],[0,1]), ([2,2],[0,1]), ([3,3],[0,1])]
+
+        self.assertEqual(expected_tasks, [(t[0],t[1]) for t in tasks])
+        self.assertEqual([[self.simulations[i] for i in t[0]] for t in tasks], [t[3] for t in tasks])
+
+    def test_not_group_learners_or_simulations(self):
+        tasks = TaskSource(self.simulations, self.learners, Result(), False, False).read()
+
+        expected_tasks = [([0],[0]), ([0],[1]), ([1],[0]), ([1],[1]), ([2],[0]), ([2],[1]), ([3],[0]), ([3],[1])]
+
+        self.assertEqual(expected_tasks, [(t[0],t[1]) for t in tasks])
+
 class Result_Tests(unittest.TestCase):
 
     def test_has_batches_key(self):
@@ -223,6 +294,66 @@ class Benchmark_Single_Tests(unittest.TestCase):
         self.assertCountEqual(actual_simulations, expected_simulations)
         self.assertCountEqual(actual_batches, expected_batches)
 
+    def test_simulation_transactions_written_once(self):
+        sim1      = LambdaSimulation(5, lambda t: t, lambda t: [0,1,2], lambda c,a: a)
+        sim2      = LambdaSimulation(4, lambda t: t, lambda t: [3,4,5], lambda c,a: a)
+        learners  = [ModuloLearner(str(i)) for i in range(4)] #type: ignore
+        benchmark = Benchmark([sim1,sim2], batch_count=1, ignore_raise=False, seeds=[1,2,3], split_learners=True, split_seeds=True)
+
+        try:
+            benchmark.evaluate(learners, "coba/tests/.temp/transactions.log")
+            transactions = Path('coba/tests/.temp/transactions.log').read_text().splitlines()
+        finally:
+            if Path('coba/tests/.temp/transactions.log').exists(): Path('coba/tests/.temp/transactions.log').unlink()
+
+        self.assertEqual(6 , len([t for t in transactions if t.startswith('["S"')]))
+        self.assertEqual(24, len([t for t in transactions if t.startswith('["B"')]))
+
+    def test_sources_read_once(self):
+        sim       = CountReadsSimulation(LambdaSimulation(5, lambda t: t, lambda t: [0,1,2], lambda c,a: a), "coba/tests/.temp/reads.log")
+        learners  = [ModuloLearner(str(i)) for i in range(3)] #type: ignore
+        benchmark = Benchmark([sim], batch_count=1, ignore_raise=False, seeds=[1,2,3])
+
+        try:
+            benchmark.evaluate(learners)
+            reads = sim.reads()
+        finally:
+            if Path('coba/tests/.temp/reads.log').exists(): Path('coba/tests/.temp/reads.log').unlink()
+
+        self.assertEqual(1, reads)
+
+    def test_split_learners(self):
+        sim       = CountReadsSimulation(LambdaSimulation(5, lambda t: t, lambda t: [0,1,2], lambda c,a: a), "coba/tests/.temp/reads.log")
+        learners  = [ModuloLearner(str(i)) for i in range(3)] #type: ignore
+        benchmark = Benchmark([sim], batch_count=1, ignore_raise=False, split_learners=True)
+
+        try:
+            actual_batches = benchmark.evaluate(learners).to_tuples()[2]
+            reads = sim.reads()
+        finally:
+            if Path('coba/tests/.temp/reads.log').exists(): Path('coba/tests/.temp/reads.log').unlink()
+
+        expected_batches = [(0, i, [5], [mean([0,1,2,0,1])]) for i in range(3)]
+
+        #learners are only split into their own tasks (each reading the source) with several processes
+        self.assertEqual(1 if ExecutionContext.Config.processes == 1 else 3, reads)
+        self.assertCountEqual(actual_batches, expected_batches)
+
+    def test_split_seeds(self):
+        sim       = CountReadsSimulation(LambdaSimulation(5, lambda t: t, lambda t: [0,1,2], lambda c,a: a), "coba/tests/.temp/reads.log")
+        learners  = [ModuloLearner(str(i)) for i in range(2)] #type: ignore
+        benchmark = Benchmark([sim], batch_sizes=[2], ignore_raise=False, seeds=[1,2,3], split_seeds=True)
+
+        try:
+            actual_batches = benchmark.evaluate(learners).to_tuples()[2]
+            reads = sim.reads()
+        finally:
+            if Path('coba/tests/.temp/reads.log').exists(): Path('coba/tests/.temp/reads.log').unlink()
+
+        #seeds are only split into their own tasks (each reading the source) with several processes
+        self.assertEqual(1 if ExecutionContext.Config.processes == 1 else 3, reads)
+        self.assertEqual(6, len(actual_batches))
+
 class Benchmark_Multi_Tests(Benchmark_Single_Tests):
     
     @classmethod
@@ -230,6 +361,23 @@ class Benchmark_Multi_Tests(Benchmark_Single_Tests):
         ExecutionContext.Logger = NoneLogger()
         ExecutionContext.Config.processes = 2
 
+    def test_same_transactions_as_single_process(self):
+        sim1      = LambdaSimulation(5, lambda t: t, lambda t: [0,1,2], lambda c,a: a)
+        sim2      = LambdaSimulation(4, lambda t: t, lambda t: [3,4,5], lambda c,a: a)
+        learners  = [ModuloLearner("0"), ModuloLearner("1")] #type: ignore
+
+        try:
+            Benchmark([sim1,sim2], batch_sizes=[2], ignore_raise=False, seeds=[1,4], processes=1).evaluate(learners, "coba/tests/.temp/single.log")
+            Benchmark([sim1,sim2], batch_sizes=[2], ignore_raise=False, seeds=[1,4], processes=2, split_learners=True, split_seeds=True).evaluate(learners, "coba/tests/.temp/multi.log")
+
+            single_transactions = Path('coba/tests/.temp/single.log').read_text().splitlines()
+            multi_transactions  = Path('coba/tests/.temp/multi.log').read_text().splitlines()
+        finally:
+            if Path('coba/tests/.temp/single.log').exists(): Path('coba/tests/.temp/single.log').unlink()
+            if Path('coba/tests/.temp/multi.log').exists(): Path('coba/tests/.temp/multi.log').unlink()
+
+        self.assertCountEqual(single_transactions, multi_transactions)
+
     def test_not_picklable_learner(self):
         sim1      = LambdaSimulation(5, lambda t: t, lambda t: [0,1,2], lambda c,a: a)
         learner   = NotPicklableLearner()
@@ -113,6 +113,21 @@ class NumericEncoder_Tests(Encoder_Interface_Tests, unittest.TestCase):
 
         self.assertTrue(math.isnan(actual))
 
+    def test_mixed_numeric_and_not_numeric_strings(self):
+
+        actual = NumericEncoder().encode(["1", "?", "2.5"])
+
+        self.assertEqual(1, actual[0])
+        self.assertTrue(math.isnan(actual[1]))
+        self.assertEqual(2.5, actual[2])
+
+    def test_overflowing_int_is_nan(self):
+
+        actual = NumericEncoder().encode([10**400, "1"])
+
+        self.assertTrue(math.isnan(actual[0]))
+        self.assertEqual(1, actual[1])
+
 class OneHotEncoder_Tests(Encoder_Interface_Tests, unittest.TestCase):
 
     def _make_unfit_encoder(self) -> Tuple[Encoder, Sequence[str], Sequence[str], Sequence[Any]]:
@@ -3,7 +3,29 @@ import unittest
 from unittest.case import SkipTest
 
 from coba.utilities import check_vowpal_support
-from coba.learners import RandomLearner, EpsilonLearner, VowpalLearner, UcbTunedLearner
+from coba.random import CobaRandom
+from coba.learners import Learner, RandomLearner, EpsilonLearner, VowpalLearner, UcbTunedLearner, CorralLearner
+from coba.learners import _log_barrier_newtons_zero
+
+#for testing purposes
+class FixedLearner(Learner[int,int]):
+    def __init__(self, probs):
+        self._probs  = probs
+        self.learned = []
+
+    @property
+    def family(self):
+        return "fixed"
+
+    @property
+    def params(self):
+        return {}
+
+    def predict(self, key, context, actions):
+        return self._probs
+
+    def learn(self, key, context, action, reward, probability):
+        self.learned.append((key, action, reward, probability))
 
 class RandomLearner_Tests(unittest.TestCase):
     
@@ -11,6 +33,12 @@ class RandomLearner_Tests(unittest.TestCase):
         learner = RandomLearner()
         self.assertEqual([0.25, 0.25, 0.25, 0.25], learner.predict(1, None, [1,2,3,4]))
 
+    def test_predict_changing_action_count(self):
+        learner = RandomLearner()
+        self.assertEqual([0.25, 0.25, 0.25, 0.25], learner.predict(1, None, [1,2,3,4]))
+        self.assertEqual([0.5, 0.5], learner.predict(2, None, [1,2]))
+        self.assertEqual([0.25, 0.25, 0.25, 0.25], learner.predict(3, None, [5,6,7,8]))
+
     def test_learn(self):
         learner = RandomLearner()
         learner.learn(2, None, 1, 1, 1)
@@ -31,6 +59,11 @@ class EpsilonLearner_Tests(unittest.TestCase):
 
         self.assertEqual([0,0,1],learner.predict(4, None, [1,2,3]))
 
+    def test_predict_one_action(self):
+        learner = EpsilonLearner(epsilon=0.1)
+
+        self.assertEqual([1],learner.predict(1, None, [1]))
+
 class UcbTunedLearner_Tests(unittest.TestCase):
     def test_predict_all_actions_first(self):
 
@@ -40,6 +73,18 @@ class UcbTunedLearner_Tests(unittest.TestCase):
         self.assertEqual([0,1,0],learner.predict(1, None, [1,2,3]))
         self.assertEqual([0,0,1],learner.predict(1, None, [1,2,3]))
 
+    def test_predict_one_action(self):
+        learner = UcbTunedLearner()
+
+        self.assertEqual([1],learner.predict(1, None, [1]))
+        self.assertEqual([1],learner.predict(1, None, [1]))
+
+    def test_predict_one_action_then_two(self):
+        learner = UcbTunedLearner()
+
+        self.assertEqual([1],learner.predict(1, None, [1]))
+        self.assertEqual([0,1],learner.predict(2, None, [1,2]))
+
     def test_learn_predict_best1(self):
         learner = UcbTunedLearner()
         actions = [1,2,3,4]
@@ -76,6 +121,100 @@ class UcbTunedLearner_Tests(unittest.TestCase):
 
         self.assertEqual([0, 0, 0, 1], learner.predict(3, None, actions))
 
+    def test_learn_predict_repeated(self):
+        learner = UcbTunedLearner()
+        actions = [1,2,3]
+
+        for i,reward in enumerate([0,1,0]):
+            learner.predict(i, None, actions)
+            learner.learn(i, None, actions[i], reward, 1)
+
+        self.assertEqual([0,1,0], learner.predict(3, None, actions))
+        self.assertEqual([0,1,0], learner.predict(4, None, actions))
+
+class CorralLearner_Tests(unittest.TestCase):
+
+    def test_predict_one_action_draws_base_randoms(self):
+        learner = CorralLearner([RandomLearner(), UcbTunedLearner()], eta=0.5, seed=10)
+        random  = CobaRandom(10)
+
+        self.assertEqual([1], learner.predict(1, None, [1]))
+
+        random.randoms(2)
+
+        self.assertEqual(random.random(), learner._random.random())
+
+    def test_interleaved_predict_learn(self):
+        base1   = FixedLearner([0,1,0])
+        base2   = FixedLearner([0,0,1])
+        learner = CorralLearner([base1, base2], eta=0.5, seed=10)
+
+        p1 = learner.predict(1, None, [1,2,3])
+        p2 = learner.predict(2, None, [4,5,6])
+        p3 = learner.predict(3, None, [7,8,9])
+
+        self.assertEqual([0,.5,.5], p1)
+        self.assertEqual([0,.5,.5], p2)
+        self.assertEqual([0,.5,.5], p3)
+
+        learner.learn(2, None, 5, 0, .5)
+        learner.learn(1, None, 3, 1, .5)
+        learner.learn(3, None, 8, 1, .5)
+
+        self.assertEqual([(2,5,-1,1), (1,2,1,1), (3,8,1,1)], base1.learned)
+        self.assertEqual([(2,6, 1,1), (1,3,1,1), (3,9,1,1)], base2.learned)
+
+    def test_predict_same_key_twice(self):
+        learner = CorralLearner([FixedLearner([0,1]), FixedLearner([0,1])], eta=0.5, seed=10)
+
+        learner.predict(1, None, [1,2])
+        learner.predict(2, None, [1,2])
+        learner.predict(1, None, [1,2])
+        learner.predict(1, None, [1,2])
+
+        learner.learn(1, None, 2, 1, 1)
+        learner.learn(2, None, 2, 1, 1)
+
+        with self.assertRaises(KeyError):
+            learner.learn(1, None, 2, 1, 1)
+
+    def test_predict_zero_weights_raises(self):
+        learner = CorralLearner([FixedLearner([0,0])], eta=0.5, seed=10)
+
+        with self.assertRaises(ValueError):
+            learner.predict(1, None, [1,2])
+
+    def test_log_barrier_omd(self):
+        learner = CorralLearner([RandomLearner(), RandomLearner(), RandomLearner()], eta=0.5)
+        learner._ps = [.2,.3,.5]
+
+        ps = learner._log_barrier_omd([0,2,.5])
+
+        self.assertAlmostEqual(1, sum(ps), places=4)
+        self.assertAlmostEqual(0.21596, ps[0], places=5)
+        self.assertAlmostEqual(0.25228, ps[1], places=5)
+        self.assertAlmostEqual(0.53177, ps[2], places=5)
+
+    def test_log_barrier_omd_no_lambda_raises(self):
+        learner = CorralLearner([RandomLearner(), RandomLearner()], eta=0.5)
+        learner._ps = [.1,.1]
+
+        with self.assertRaises(Exception) as e:
+            learner._log_barrier_omd([0,1])
+
+        self.assertIn("unable to find a normalizing lambda", str(e.exception))
+
+    def test_log_barrier_newtons_zero_zero_derivative_raises(self):
+        #these values make Newton's method step so far that the derivative underflows to 0
+        ps     = [2.4808929719466663e-07]
+        etas   = [5.320812311284364e-174]
+        losses = [0]
+
+        with self.assertRaises(Exception) as e:
+            _log_barrier_newtons_zero(ps, etas, losses, 0, 7.575546467337311e+179, 4)
+
+        self.assertIn("zero derivative", str(e.exception))
+
 class VowpalLearner_Tests(unittest.TestCase):
     
     @classmethod
@@ -210,5 +210,16 @@ class Random_Tests(unittest.TestCase):
 
         self.assertIsInstance(choice, tuple)
 
+    def test_choice3(self):
+        weights = [0,1,0]
+        choices = [(0,1), (1,0), (1,1)]
+
+        for _ in range(100):
+            self.assertEqual((1,0), coba.random.choice(choices,weights))
+
+    def test_choice_zero_weights(self):
+        with self.assertRaises(ValueError):
+            coba.random.choice([1,2], [0,0])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
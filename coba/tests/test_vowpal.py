@@ -0,0 +1,96 @@
+import unittest
+
+import coba.vowpal
+
+from coba.vowpal import cb_explore_Formatter, cb_explore_adf_Formatter
+
+class cb_explore_Formatter_Tests(unittest.TestCase):
+
+    def test_predict(self):
+        formatter = cb_explore_Formatter()
+
+        self.assertEqual("|s 0:1 2:2.5 a", formatter.predict((1,0,2.5,'a'), [1,2]))
+
+    def test_learn(self):
+        formatter = cb_explore_Formatter()
+
+        self.assertEqual("2:-1:0.5 |s 0:1 1:2", formatter.learn(0.5, [1,2], (1,2), 2, 1))
+
+    def test_equal_contexts_of_different_types(self):
+        formatter = cb_explore_Formatter()
+
+        self.assertEqual("|s 0:True 1:2", formatter.predict((True,2), [1]))
+        self.assertEqual("|s 0:1 1:2"   , formatter.predict((1,2), [1]))
+        self.assertEqual("|s 0:1.0 1:2.0", formatter.predict((1.0,2.0), [1]))
+
+    def test_predict_learn_same_context(self):
+        formatter = cb_explore_Formatter()
+        context   = (1,2)
+
+        self.assertEqual("|s 0:1 1:2", formatter.predict(context, [1,2]))
+        self.assertEqual("1:-1:0.5 |s 0:1 1:2", formatter.learn(0.5, [1,2], context, 1, 1))
+
+    def test_list_context_changed_in_place(self):
+        formatter = cb_explore_Formatter()
+        context   = [1,2]
+
+        self.assertEqual("|s 0:1 1:2", formatter.predict(context, [1]))
+
+        context[1] = 3
+
+        self.assertEqual("|s 0:1 1:3", formatter.predict(context, [1]))
+
+    def test_context_cache_is_bounded(self):
+        formatter = cb_explore_Formatter()
+
+        for i in range(coba.vowpal._FORMAT_CACHE_SIZE+10):
+            self.assertEqual(f"|s 0:{i+1}", formatter.predict((i+1,), [1]))
+
+        self.assertLessEqual(len(formatter._context_features), coba.vowpal._FORMAT_CACHE_SIZE)
+
+class cb_explore_adf_Formatter_Tests(unittest.TestCase):
+
+    def test_predict(self):
+        formatter = cb_explore_adf_Formatter()
+
+        self.assertEqual("shared |s 0:1 1:2\n|a 0:1\n|a 1:1", formatter.predict((1,2), [(1,0),(0,1)]))
+
+    def test_predict_no_context(self):
+        formatter = cb_explore_adf_Formatter()
+
+        self.assertEqual("|a 0:1\n|a 1:1", formatter.predict(None, [(1,0),(0,1)]))
+
+    def test_learn(self):
+        formatter = cb_explore_adf_Formatter()
+
+        self.assertEqual("shared |s 0:1 1:2\n |a 0:1\n0:-1:0.5 |a 1:1", formatter.learn(0.5, [(1,0),(0,1)], (1,2), (0,1), 1))
+
+    def test_equal_contexts_of_different_types(self):
+        formatter = cb_explore_adf_Formatter()
+
+        self.assertEqual("shared |s 0:True 1:2\n|a 0:1", formatter.predict((True,2), [1]))
+        self.assertEqual("shared |s 0:1 1:2\n|a 0:1"   , formatter.predict((1,2), [1]))
+        self.assertEqual("shared |s 0:1.0 1:2.0\n|a 0:1", formatter.predict((1.0,2.0), [1]))
+
+    def test_equal_actions_of_different_types(self):
+        formatter = cb_explore_adf_Formatter()
+
+        self.assertEqual("|a 0:1.0\n|a 1:1.0"    , formatter.predict(None, [(1.0,0.0),(0.0,1.0)]))
+        self.assertEqual("|a 0:1\n|a 1:1"        , formatter.predict(None, [(1,0),(0,1)]))
+        self.assertEqual("|a 0:True\n|a 1:True"  , formatter.predict(None, [(True,False),(False,True)]))
+
+    def test_action_cache_is_bounded(self):
+        formatter = cb_explore_adf_Formatter()
+
+        for i in range(coba.vowpal._FORMAT_CACHE_SIZE+10):
+            self.assertEqual(f"|a 0:{i+1}", formatter.predict(None, [(i+1,)]))
+
+        self.assertLessEqual(len(formatter._action_features), coba.vowpal._FORMAT_CACHE_SIZE)
+
+    def test_unhashable_actions(self):
+        formatter = cb_explore_adf_Formatter()
+
+        self.assertEqual("|a 0:1\n|a 1:1", formatter.predict(None, [[1,0],[0,1]]))
+
+if __name__ == '__main__':
+    unittest.main()
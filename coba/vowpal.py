@@ -3,7 +3,7 @@
 TODO Add unittests
 """
 
-import collections
+import collections.abc
 
 from os import devnull
 from typing import Any, Dict, Tuple, Union, Sequence
@@ -13,30 +13,43 @@ from coba.execution import redirect_stderr
 from coba.utilities import check_vowpal_support
 from coba.simulations import Context, Action, Choice
 
+_FORMAT_CACHE_SIZE = 1000
+
 class cb_explore_Formatter:
-    @staticmethod
-    def predict(context, actions) -> str:
-        return f"|s {_features_format(context)}"
 
-    @staticmethod
-    def learn(prob, actions, context: Context, action: Action, reward: float) -> str:
-        return f"{actions.index(action)+1}:{-reward}:{prob} |s {_features_format(context)}"
+    def __init__(self) -> None:
+        #every context is formatted for predict and again for learn so we remember recent contexts
+        self._context_features: Dict[int, Tuple[Context, str]] = {}
+
+    def predict(self, context, actions) -> str:
+        return f"|s {_cached_format(self._context_features, context)}"
+
+    def learn(self, prob, actions, context: Context, action: Action, reward: float) -> str:
+        return f"{actions.index(action)+1}:{-reward}:{prob} |s {_cached_format(self._context_features, context)}"
 
 class cb_explore_adf_Formatter:
-    @staticmethod
-    def predict(context: Context, actions:Sequence[Action]) -> str:
-        vw_context = None if context is None else f"shared |s {_features_format(context)}"
-        vw_actions = [ f"|a {_features_format(a)}" for a in actions]
+
+    def __init__(self) -> None:
+        #every context is formatted for predict and again for learn so we remember recent contexts
+        self._context_features: Dict[int, Tuple[Context, str]] = {}
+
+        #action sets rarely change between interactions so we remember recent actions too
+        self._action_features: Dict[int, Tuple[Action, str]] = {}
+
+    def predict(self, context: Context, actions:Sequence[Action]) -> str:
+        vw_context = None if context is None else f"shared |s {_cached_format(self._context_features, context)}"
+        vw_actions = [ f"|a {self._action_format(a)}" for a in actions]
         return "\n".join(filter(None,[vw_context, *vw_actions]))
 
-    @staticmethod
-    def learn(prob, actions, context: Context, action: Action, reward: float) -> str:
-        vw_context   = None if context is None else f"shared |s {_features_format(context)}"
-        vw_rewards  = [ "" if a != action else f"0:{-reward}:{prob}" for a in actions ]
-        vw_actions  = [ _features_format(a) for a in actions]
-        vw_observed = [ f"{r} |a {a}" for r,a in zip(vw_rewards,vw_actions) ]
+    def learn(self, prob, actions, context: Context, action: Action, reward: float) -> str:
+        vw_context  = None if context is None else f"shared |s {_cached_format(self._context_features, context)}"
+        vw_reward   = f"0:{-reward}:{prob}"
+        vw_observed = [ f"{vw_reward if a == action else ''} |a {self._action_format(a)}" for a in actions ]
         return "\n".join(filter(None,[vw_context, *vw_observed]))
 
+    def _action_format(self, action: Action) -> str:
+        return _cached_format(self._action_features, action)
+
 class pyvw_Wrapper:
     def __init__(self, format: Union[cb_explore_Formatter, cb_explore_adf_Formatter], seed: int = None) -> None:
         check_vowpal_support('VowpalLearner.__init__')
@@ -207,6 +220,33 @@ class bagging:
         
         return f"--bag {self._n_policies}"
 
+def _cached_format(cache: Dict[int, Tuple[Union[Context,Action], str]], features: Union[Context,Action]) -> str:
+    """Format features, reusing the formatted string if these same features were formatted recently.
+
+    Remarks:
+        The cache is keyed by object identity rather than equality. Equal features such as (1,0),
+        (1.0,0.0) and (True,0) format differently so they must never share an entry. Each entry
+        keeps its features alive so an id can't be reused while it is cached, and the cache is
+        emptied once it holds `_FORMAT_CACHE_SIZE` entries so it never grows without bound. List
+        features are never cached since they could be changed in place between interactions.
+    """
+
+    if isinstance(features, list):
+        return _features_format(features)
+
+    entry = cache.get(id(features))
+
+    if entry is not None and entry[0] is features:
+        return entry[1]
+
+    if len(cache) >= _FORMAT_CACHE_SIZE:
+        cache.clear()
+
+    formatted = _features_format(features)
+    cache[id(features)] = (features, formatted)
+
+    return formatted
+
 def _features_format(features: Union[Context,Action]) -> str:
     """convert features into the proper format for pyvw.
 
@@ -220,27 +260,15 @@ def _features_format(features: Union[Context,Action]) -> str:
         Note, using the enumeration index for action features below only works if all actions
         have the same number of features. If some actions simply leave out features in their
         feature array a more advanced method may need to be implemented in the future...
+
+        In feature formatting we prepend a "name" (i.e., the index) to each numeric feature. This
+        makes it possible to compare features across actions/contexts. See the definition of `Features`
+        at the top of https://github.com/VowpalWabbit/vowpal_wabbit/wiki/Input-format for more info.
     """
 
-    if not isinstance(features, collections.Sequence):
+    #features are almost always tuples or lists so we check for those before the slower abc check
+    if not isinstance(features, (tuple,list)) and not isinstance(features, collections.abc.Sequence):
         features = (features,)
 
-    if isinstance(features, collections.Sequence):
-        return " ". join([_feature_format(i,f) for i,f in enumerate(features) if f is not None and f != 0 ])
-
-    raise Exception("We were unable to determine an appropriate vw context format.")
-
-def _feature_format(name: Any, value: Any) -> str:
-    """Convert a feature into the proper format for pyvw.
-
-    Args:
-        name: The name of the feature.
-        value: The value of the feature.
-
-    Remarks:
-        In feature formatting we prepend a "name" to each feature. This makes it possible
-        to compare features across actions/contexts. See the definition of `Features` at 
-        the top of https://github.com/VowpalWabbit/vowpal_wabbit/wiki/Input-format for more info.
-    """
-
-    return f"{name}:{value}" if isinstance(value,(int,float)) else f"{value}"
+    #this is called for every context and action so each feature is formatted inline rather than via a function call
+    return " ".join([ f"{i}:{f}" if isinstance(f,(int,float)) else f"{f}" for i,f in enumerate(features) if f is not None and f != 0 ])
@@ -1,6 +1,9 @@
 """
 This is an example script that creates a ClassificationSimulation using the covertype dataset.
 This script requires that the matplotlib and vowpalwabbit packages be installed.
+
+Results are written to a transaction log so re-running the script (e.g., to tweak the plot)
+only evaluates the simulation/learner pairs that haven't already finished.
 """
 
 from coba.simulations import OpenmlSimulation
@@ -12,12 +15,12 @@ if __name__ == '__main__':
     benchmark  = Benchmark([simulation], batch_size=2, take=5000, seeds=list(range(3)))
 
     learners = [
-        RandomLearner(seed=10),
-        EpsilonLearner(0.025,seed=10),
-        UcbTunedLearner(seed=10),
+        RandomLearner(),
+        EpsilonLearner(0.025),
+        UcbTunedLearner(),
         VowpalLearner(epsilon=0.025,seed=10),
         VowpalLearner(bag=5,seed=10),
         VowpalLearner(softmax=3.5,seed=10)
     ]
 
-    benchmark.evaluate(learners).standard_plot()
\ No newline at end of file
+    benchmark.evaluate(learners, './examples/covtype.log', seed=10).standard_plot()
\ No newline at end of file